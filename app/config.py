@@ -47,6 +47,13 @@ class Settings(BaseSettings):
     vision_worker_url: str = ""
     commonforms_worker_url: str = ""
     
+    # CommonForms
+    commonforms_skip_acroform: bool = False  # Opt-in: serve PDFs whose every page has AcroForm fields as-is, without the model
+    commonforms_model: str = "FFDetr"  # FFDetr, FFDNet-S/L, or a local weights path
+    commonforms_fast: bool = False  # FFDNet only: faster, lower-precision inference
+    commonforms_batch_size: int = 4  # Pages per model.predict() call
+    commonforms_device: str = "auto"  # auto, cpu, cuda, or mps
+    
     # Vision AI
     openai_api_key: str = ""
     gemini_api_key: str = ""
@@ -40,6 +40,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("DocumentAI API shutting down...")
+    from app.services.supabase_storage import SupabaseStorageService
+    await SupabaseStorageService.close_clients()
 
 
 @app.get("/")
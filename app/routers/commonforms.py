@@ -1,7 +1,8 @@
 """
 CommonForms Router - API endpoints for CommonForms processing
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
@@ -13,6 +14,7 @@ from app.models.document import Document, DocumentStatus
 from app.models.user import User
 from app.models.field import FieldRegion
 from app.services.storage import get_storage_service
+from app.services.pdf_fields import extract_fields_from_pdf, map_commonforms_type
 from app.services.cloud_tasks import get_cloud_tasks_service
 from app.utils.logging import get_logger
 
@@ -56,8 +58,9 @@ def get_current_user(db: Session = Depends(get_db)) -> User:
 
 
 @router.post("/commonforms/{document_id}", response_model=ProcessCommonFormsResponse)
-async def process_commonforms(
+def process_commonforms(
     document_id: UUID,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
@@ -110,9 +113,9 @@ async def process_commonforms(
         logger.warning(f"Cloud Tasks unavailable, starting background processing: {e}")
         _job_store[job_id]["status"] = "processing"
         
-        # Start background task for direct processing
-        import asyncio
-        asyncio.create_task(_process_commonforms_background(str(document_id), job_id))
+        # Start background task for direct processing; this handler runs in the
+        # threadpool, so let FastAPI schedule it on the event loop after the response
+        background_tasks.add_task(_process_commonforms_background, str(document_id), job_id)
     
     return ProcessCommonFormsResponse(jobId=job_id)
 
@@ -165,15 +168,13 @@ async def _process_commonforms_background(document_id: str, job_id: str):
         _job_store[job_id]["status"] = "failed"
         _job_store[job_id]["error"] = "Processing timed out"
     except Exception as e:
-        logger.error(f"Background CommonForms processing failed: {e}")
-        import traceback
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error(f"Background CommonForms processing failed: {e}", exc_info=True)
         _job_store[job_id]["status"] = "failed"
         _job_store[job_id]["error"] = str(e)
 
 
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(
+def get_job_status(
     job_id: str,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -314,8 +315,10 @@ async def process_commonforms_sync(
                 device="cpu"
             )
             
-            # Extract fields from generated PDF
-            field_metadata = _extract_fields_from_pdf(output_path)
+            # Extract fields from generated PDF, reading it once for extraction and upload
+            with open(output_path, "rb") as f:
+                output_bytes = f.read()
+            field_metadata = extract_fields_from_pdf(output_bytes)
             
         except ImportError:
             raise HTTPException(
@@ -330,37 +333,43 @@ async def process_commonforms_sync(
         
         # Upload output PDF
         output_key = f"commonforms/{document.user_id}/{document_id}/fillable.pdf"
-        await storage.upload_file(
-            local_path=output_path,
+        await storage.upload_bytes(
+            data=output_bytes,
             key=output_key,
             content_type="application/pdf"
         )
         
-        # Parse fields and save to DB
+        # Parse fields and save to DB in a single batched INSERT
+        field_rows = []
         fields = []
-        for idx, field in enumerate(field_metadata):
-            field_region = FieldRegion(
-                document_id=document.id,
-                page_index=field.get('page', 0),
-                x=field.get('bbox', [0, 0, 1, 1])[0],
-                y=field.get('bbox', [0, 0, 1, 1])[1],
-                width=field.get('bbox', [0, 0, 1, 1])[2] - field.get('bbox', [0, 0, 1, 1])[0],
-                height=field.get('bbox', [0, 0, 1, 1])[3] - field.get('bbox', [0, 0, 1, 1])[1],
-                field_type=_map_field_type(field.get('type', 'text')),
-                label=field.get('label', f'Field_{idx}'),
-                confidence=1.0,
-                template_key=field.get('name')
-            )
-            db.add(field_region)
+        for field in field_metadata:
+            field_id = uuid4()
+            x0, y0, x1, y1 = field.bbox
+            field_rows.append({
+                'id': field_id,
+                'document_id': document.id,
+                'page_index': field.page,
+                'x': x0,
+                'y': y0,
+                'width': x1 - x0,
+                'height': y1 - y0,
+                'field_type': map_commonforms_type(field.type),
+                'label': field.name,
+                'confidence': 1.0,
+                'template_key': field.name
+            })
             
             fields.append(FieldInfo(
-                id=str(field_region.id),
-                type=field.get('type', 'text'),
-                page=field.get('page', 0),
-                bbox=field.get('bbox', [0, 0, 1, 1]),
-                label=field.get('label')
+                id=str(field_id),
+                type=field.type,
+                page=field.page,
+                bbox=field.bbox,
+                label=field.name
             ))
         
+        if field_rows:
+            db.execute(insert(FieldRegion), field_rows)
+        
         # Update document
         document.status = DocumentStatus.ready
         document.storage_key_filled = output_key
@@ -376,79 +385,8 @@ async def process_commonforms_sync(
         )
 
 
-def _extract_fields_from_pdf(pdf_path: str) -> list:
-    """Extract AcroForm fields from CommonForms-generated PDF."""
-    import fitz
-    
-    fields = []
-    pdf_doc = fitz.open(pdf_path)
-    
-    try:
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc[page_num]
-            page_rect = page.rect
-            
-            for widget in page.widgets():
-                if widget is None:
-                    continue
-                
-                field_name = widget.field_name or f"field_{page_num}_{len(fields)}"
-                field_type_code = widget.field_type
-                rect = widget.rect
-                
-                # Map widget type
-                if field_type_code == fitz.PDF_WIDGET_TYPE_TEXT:
-                    field_type = "text"
-                elif field_type_code == fitz.PDF_WIDGET_TYPE_BUTTON:
-                    field_type = "checkbox"
-                elif field_type_code == fitz.PDF_WIDGET_TYPE_SIGNATURE:
-                    field_type = "signature"
-                else:
-                    field_type = "text"
-                
-                # Infer from CommonForms naming
-                name_lower = field_name.lower()
-                if "checkbox" in name_lower or "choicebutton" in name_lower:
-                    field_type = "checkbox"
-                elif "signature" in name_lower:
-                    field_type = "signature"
-                
-                bbox = [
-                    rect.x0 / page_rect.width,
-                    rect.y0 / page_rect.height,
-                    rect.x1 / page_rect.width,
-                    rect.y1 / page_rect.height
-                ]
-                
-                fields.append({
-                    'page': page_num,
-                    'type': field_type,
-                    'bbox': bbox,
-                    'label': field_name,
-                    'name': field_name
-                })
-    finally:
-        pdf_doc.close()
-    
-    return fields
-
-
-def _map_field_type(cf_type: str):
-    """Map CommonForms field type to FieldType enum."""
-    from app.models.field import FieldType
-    type_map = {
-        'text': FieldType.text,
-        'textarea': FieldType.multiline,
-        'checkbox': FieldType.checkbox,
-        'date': FieldType.date,
-        'number': FieldType.number,
-        'signature': FieldType.signature,
-    }
-    return type_map.get(cf_type.lower(), FieldType.text)
-
-
 @router.post("/commonforms/{document_id}/mock", response_model=JobStatusResponse)
-async def process_commonforms_mock(
+def process_commonforms_mock(
     document_id: UUID,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
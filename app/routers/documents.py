@@ -2,8 +2,6 @@ from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
-import tempfile
-import os
 
 from app.database import get_db
 from app.models.document import Document, DocumentStatus
@@ -23,7 +21,7 @@ from app.schemas.field import (
 )
 from app.models.field import FieldRegion, FieldValue
 from app.services.storage import get_storage_service
-from app.utils.hashing import compute_file_hash
+from app.utils.hashing import compute_bytes_hash
 from app.utils.logging import get_logger
 from app.services.cloud_tasks import get_cloud_tasks_service
 
@@ -63,55 +61,44 @@ async def init_upload(
             detail="Only PDF and image files are supported"
         )
     
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        content = await file.read()
-        tmp_file.write(content)
-        tmp_path = tmp_file.name
+    # Keep the upload in memory; hashing and storage both work on the bytes
+    content = await file.read()
+    file_hash = compute_bytes_hash(content)
     
-    try:
-        # Compute hash
-        file_hash = compute_file_hash(tmp_path)
-        
-        # Create document record
-        document = Document(
-            user_id=user.id,
-            file_name=file.filename or "document.pdf",
-            mime_type=file.content_type,
-            storage_key_original=f"originals/{user.id}/{file_hash}",
-            status=DocumentStatus.imported,
-            hash_fingerprint=file_hash
-        )
-        db.add(document)
-        db.commit()
-        db.refresh(document)
-        
-        # Upload to storage
-        storage = get_storage_service()
-        await storage.upload_file(
-            local_path=tmp_path,
-            key=document.storage_key_original,
-            content_type=file.content_type
-        )
-        
-        logger.info(f"Document created: {document.id}")
-        
-        # Convert to response
-        doc_summary = DocumentSummary.model_validate(document)
-        
-        return InitUploadResponse(
-            documentId=document.id,
-            document=doc_summary
-        )
+    # Create document record
+    document = Document(
+        user_id=user.id,
+        file_name=file.filename or "document.pdf",
+        mime_type=file.content_type,
+        storage_key_original=f"originals/{user.id}/{file_hash}",
+        status=DocumentStatus.imported,
+        hash_fingerprint=file_hash
+    )
+    db.add(document)
+    db.commit()
+    db.refresh(document)
     
-    finally:
-        # Cleanup temp file
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+    # Upload to storage
+    storage = get_storage_service()
+    await storage.upload_bytes(
+        data=content,
+        key=document.storage_key_original,
+        content_type=file.content_type
+    )
+    
+    logger.info(f"Document created: {document.id}")
+    
+    # Convert to response
+    doc_summary = DocumentSummary.model_validate(document)
+    
+    return InitUploadResponse(
+        documentId=document.id,
+        document=doc_summary
+    )
 
 
 @router.post("/{document_id}/process", response_model=ProcessDocumentResponse)
-async def process_document(
+def process_document(
     document_id: UUID,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -152,7 +139,7 @@ async def process_document(
 
 
 @router.get("/{document_id}", response_model=DocumentDetailResponse)
-async def get_document(
+def get_document(
     document_id: UUID,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -217,7 +204,7 @@ async def get_document(
 
 
 @router.post("/{document_id}/values", response_model=SubmitValuesResponse)
-async def submit_values(
+def submit_values(
     document_id: UUID,
     request: SubmitValuesRequest,
     db: Session = Depends(get_db),
@@ -237,14 +224,21 @@ async def submit_values(
             detail="Document not found"
         )
     
-    # Upsert field values
-    for value_input in request.values:
-        # Check if value already exists
-        existing = db.query(FieldValue).filter(
+    # Load every existing value for the submitted fields in one query
+    region_ids = [value_input.fieldRegionId for value_input in request.values]
+    existing_values = {
+        value.field_region_id: value
+        for value in db.query(FieldValue).filter(
             FieldValue.document_id == document_id,
-            FieldValue.field_region_id == value_input.fieldRegionId,
+            FieldValue.field_region_id.in_(region_ids),
             FieldValue.user_id == user.id
-        ).first()
+        )
+    } if region_ids else {}
+    
+    # Upsert field values
+    new_values = []
+    for value_input in request.values:
+        existing = existing_values.get(value_input.fieldRegionId)
         
         if existing:
             existing.value = value_input.value
@@ -257,7 +251,11 @@ async def submit_values(
                 value=value_input.value,
                 source=value_input.source
             )
-            db.add(field_value)
+            # Track it so a repeated fieldRegionId in the same request updates this row
+            existing_values[value_input.fieldRegionId] = field_value
+            new_values.append(field_value)
+    
+    db.add_all(new_values)
     
     document.status = DocumentStatus.filling
     db.commit()
@@ -271,7 +269,7 @@ async def submit_values(
 
 
 @router.post("/{document_id}/compose", response_model=ProcessDocumentResponse)
-async def compose_document(
+def compose_document(
     document_id: UUID,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -306,7 +304,7 @@ async def compose_document(
 
 
 @router.get("/{document_id}/download", response_model=DownloadResponse)
-async def download_document(
+def download_document(
     document_id: UUID,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
@@ -0,0 +1,125 @@
+"""
+PDF field extraction shared by the API and the CommonForms worker.
+"""
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+import re
+from app.models.field import FieldType
+
+
+# CommonForms names widgets textbox_N / choiceButton_N / signature_N; one
+# case-insensitive pass names the field type via the matching group
+COMMONFORMS_NAME_RE = re.compile(
+    r"(?P<checkbox>checkbox|choicebutton)|(?P<signature>signature)|(?P<text>textbox)",
+    re.IGNORECASE,
+)
+
+
+# PDF widget type code -> field type; anything else (e.g. push buttons) is text.
+# Keyed on PyMuPDF's PDF_WIDGET_TYPE_* values so the API can import this module
+# without PyMuPDF installed.
+WIDGET_TYPE_MAP = {
+    2: "checkbox",  # PDF_WIDGET_TYPE_CHECKBOX
+    3: "text",  # PDF_WIDGET_TYPE_COMBOBOX
+    4: "text",  # PDF_WIDGET_TYPE_LISTBOX
+    5: "checkbox",  # PDF_WIDGET_TYPE_RADIOBUTTON
+    6: "signature",  # PDF_WIDGET_TYPE_SIGNATURE
+    7: "text",  # PDF_WIDGET_TYPE_TEXT
+}
+
+
+COMMONFORMS_TYPE_MAP = {
+    'text': FieldType.text,
+    'textarea': FieldType.multiline,
+    'checkbox': FieldType.checkbox,
+    'date': FieldType.date,
+    'number': FieldType.number,
+    'signature': FieldType.signature,
+    'radio': FieldType.checkbox,
+    'select': FieldType.text,
+}
+
+
+@dataclass(slots=True)
+class ExtractedField:
+    """A form widget read from a PDF, with its bbox normalized to [0,1]."""
+    page: int
+    type: str
+    bbox: List[float]
+    name: str
+
+
+def map_commonforms_type(cf_type: str) -> FieldType:
+    """Map CommonForms field type to FieldType enum."""
+    return COMMONFORMS_TYPE_MAP.get(cf_type.lower(), FieldType.text)
+
+
+def extract_fields_from_pdf(pdf: Union[str, bytes]) -> List[ExtractedField]:
+    """
+    Extract AcroForm fields from the CommonForms-generated PDF.
+    Accepts a file path, or the PDF bytes when the caller already has them in memory.
+    """
+    import fitz  # PyMuPDF
+    
+    fields = []
+    if isinstance(pdf, (bytes, bytearray)):
+        pdf_doc = fitz.open(stream=pdf, filetype="pdf")
+    else:
+        pdf_doc = fitz.open(pdf)
+    
+    try:
+        # No AcroForm means no widgets on any page, so skip the page walk
+        if not pdf_doc.is_form_pdf:
+            return fields
+        
+        for page_num, page in enumerate(pdf_doc):
+            if page.first_widget is None:
+                continue
+            page_rect = page.rect
+            # One scale matrix per page maps every widget rect into [0,1] space
+            to_unit = fitz.Matrix(1 / page_rect.width, 0, 0, 1 / page_rect.height, 0, 0)
+            
+            for widget in page.widgets():
+                if widget is None:
+                    continue
+                
+                field_name = widget.field_name or f"field_{page_num}_{len(fields)}"
+                
+                # Map PDF widget type
+                field_type = WIDGET_TYPE_MAP.get(widget.field_type, "text")
+                
+                # Infer from CommonForms naming convention
+                name_match = COMMONFORMS_NAME_RE.search(field_name)
+                if name_match:
+                    field_type = name_match.lastgroup
+                
+                # Normalize bbox to [0,1] coordinates
+                bbox = list(widget.rect * to_unit)
+                
+                fields.append(ExtractedField(
+                    page=page_num,
+                    type=field_type,
+                    bbox=bbox,
+                    name=field_name
+                ))
+    finally:
+        pdf_doc.close()
+    
+    return fields
+
+
+def inspect_pdf(pdf_path: str) -> Tuple[int, bool, bool]:
+    """
+    Return the page count, whether the PDF already contains AcroForm fields,
+    and whether every page carries at least one widget.
+    """
+    import fitz  # PyMuPDF
+    
+    pdf_doc = fitz.open(pdf_path)
+    try:
+        # is_form_pdf is the field count, or False when there is no AcroForm
+        has_fields = bool(pdf_doc.is_form_pdf)
+        all_pages_covered = has_fields and all(page.first_widget is not None for page in pdf_doc)
+        return len(pdf_doc), has_fields, all_pages_covered
+    finally:
+        pdf_doc.close()
@@ -9,6 +9,10 @@ class StorageService(Protocol):
         """Upload file and return storage URL"""
         ...
     
+    async def upload_bytes(self, *, data: bytes, key: str, content_type: str) -> str:
+        """Upload in-memory content and return storage URL"""
+        ...
+    
     async def download_to_path(self, *, key: str, local_path: str) -> None:
         """Download file from storage to local path"""
         ...
@@ -29,6 +33,11 @@ class GCSStorageService:
         blob.upload_from_filename(local_path, content_type=content_type)
         return f"gs://{settings.gcs_bucket_name}/{key}"
     
+    async def upload_bytes(self, *, data: bytes, key: str, content_type: str) -> str:
+        blob = self.bucket.blob(key)
+        blob.upload_from_string(data, content_type=content_type)
+        return f"gs://{settings.gcs_bucket_name}/{key}"
+    
     async def download_to_path(self, *, key: str, local_path: str) -> None:
         blob = self.bucket.blob(key)
         blob.download_to_filename(local_path)
@@ -65,6 +74,15 @@ class S3StorageService:
             )
         return f"s3://{self.bucket_name}/{key}"
     
+    async def upload_bytes(self, *, data: bytes, key: str, content_type: str) -> str:
+        self.client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=data,
+            ContentType=content_type
+        )
+        return f"s3://{self.bucket_name}/{key}"
+    
     async def download_to_path(self, *, key: str, local_path: str) -> None:
         self.client.download_file(self.bucket_name, key, local_path)
     
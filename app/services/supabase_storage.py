@@ -2,6 +2,8 @@
 Supabase Storage Service - Alternative to GCS/S3
 Uses Supabase Storage REST API for file operations
 """
+import asyncio
+import random
 import httpx
 from typing import Optional
 from app.config import settings
@@ -9,6 +11,15 @@ from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Supabase Storage intermittently answers 5xx/429 (notably 504 Gateway Timeout)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Only failures that happen before the request was processed; a read timeout on
+# the 300s client could otherwise stretch one call far past the caller's timeout
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
 
 class SupabaseStorageService:
     """
@@ -20,6 +31,11 @@ class SupabaseStorageService:
     - SUPABASE_BUCKET_NAME
     """
     
+    # Shared by every instance in the process so connections are kept alive
+    # between requests instead of paying a TCP + TLS handshake per call
+    _client: Optional[httpx.AsyncClient] = None
+    _sync_client: Optional[httpx.Client] = None
+    
     def __init__(self):
         self.base_url = f"{settings.supabase_url}/storage/v1"
         self.bucket = settings.supabase_bucket_name
@@ -28,29 +44,74 @@ class SupabaseStorageService:
             "apikey": settings.supabase_service_role_key
         }
     
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = httpx.AsyncClient(timeout=300.0)
+        return cls._client
+    
+    @classmethod
+    def _get_sync_client(cls) -> httpx.Client:
+        if cls._sync_client is None or cls._sync_client.is_closed:
+            cls._sync_client = httpx.Client(timeout=30.0)
+        return cls._sync_client
+    
+    @classmethod
+    async def close_clients(cls) -> None:
+        """Close the shared HTTP clients, releasing pooled connections"""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+        if cls._sync_client is not None:
+            cls._sync_client.close()
+            cls._sync_client = None
+    
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures with jittered exponential backoff"""
+        client = self._get_client()
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_ATTEMPTS:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except RETRY_EXCEPTIONS as e:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            
+            # Full jitter keeps concurrent retries from hitting Supabase in lockstep
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            logger.warning(f"Supabase {method} {url} failed ({reason}), retry {attempt}/{MAX_ATTEMPTS - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
     async def upload_file(self, *, local_path: str, key: str, content_type: str) -> str:
         """Upload file to Supabase Storage"""
+        with open(local_path, 'rb') as f:
+            file_content = f.read()
+        
+        return await self.upload_bytes(data=file_content, key=key, content_type=content_type)
+    
+    async def upload_bytes(self, *, data: bytes, key: str, content_type: str) -> str:
+        """Upload in-memory content to Supabase Storage"""
         try:
-            with open(local_path, 'rb') as f:
-                file_content = f.read()
-            
             # Use upsert to overwrite if exists
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/object/{self.bucket}/{key}",
-                    content=file_content,
-                    headers={
-                        **self.headers,
-                        "Content-Type": content_type,
-                        "x-upsert": "true"  # Allow overwriting
-                    }
-                )
-                
-                # Log response for debugging
-                if response.status_code >= 400:
-                    logger.error(f"Supabase upload failed: {response.status_code} - {response.text}")
-                
-                response.raise_for_status()
+            response = await self._request(
+                "POST",
+                f"{self.base_url}/object/{self.bucket}/{key}",
+                content=data,
+                headers={
+                    **self.headers,
+                    "Content-Type": content_type,
+                    "x-upsert": "true"  # Allow overwriting
+                }
+            )
+            
+            # Log response for debugging
+            if response.status_code >= 400:
+                logger.error(f"Supabase upload failed: {response.status_code} - {response.text}")
+            
+            response.raise_for_status()
             
             logger.info(f"Uploaded file to Supabase: {key}")
             return f"{self.base_url}/object/public/{self.bucket}/{key}"
@@ -62,15 +123,15 @@ class SupabaseStorageService:
     async def download_to_path(self, *, key: str, local_path: str) -> None:
         """Download file from Supabase Storage"""
         try:
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.get(
-                    f"{self.base_url}/object/{self.bucket}/{key}",
-                    headers=self.headers
-                )
-                response.raise_for_status()
-                
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
+            response = await self._request(
+                "GET",
+                f"{self.base_url}/object/{self.bucket}/{key}",
+                headers=self.headers
+            )
+            response.raise_for_status()
+            
+            with open(local_path, 'wb') as f:
+                f.write(response.content)
             
             logger.info(f"Downloaded file from Supabase: {key}")
         
@@ -84,9 +145,7 @@ class SupabaseStorageService:
         Note: This is a synchronous operation.
         """
         try:
-            import requests
-            
-            response = requests.post(
+            response = self._get_sync_client().post(
                 f"{self.base_url}/object/sign/{self.bucket}/{key}",
                 json={"expiresIn": expires_in},
                 headers=self.headers
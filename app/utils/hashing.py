@@ -8,3 +8,8 @@ def compute_file_hash(file_path: str) -> str:
         for byte_block in iter(lambda: f.read(4096), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
+
+
+def compute_bytes_hash(data: bytes) -> str:
+    """Compute SHA256 hash of in-memory content"""
+    return hashlib.sha256(data).hexdigest()
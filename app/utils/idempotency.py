@@ -1,7 +1,7 @@
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
-from app.models.document import Document
+from app.models.document import Document, DocumentStatus
 
 
 def find_duplicate_document(db: Session, user_id: UUID, file_hash: str) -> Optional[Document]:
@@ -10,3 +10,20 @@ def find_duplicate_document(db: Session, user_id: UUID, file_hash: str) -> Optio
         Document.user_id == user_id,
         Document.hash_fingerprint == file_hash
     ).first()
+
+
+def find_processed_duplicate(db: Session, document: Document, filled_key_suffix: str) -> Optional[Document]:
+    """
+    Find another ready document with the same hash whose fields can be reused.
+    filled_key_suffix restricts matches to fillable PDFs produced with the same
+    detection settings, which are encoded in the storage key.
+    """
+    if not document.hash_fingerprint:
+        return None
+    return db.query(Document).filter(
+        Document.id != document.id,
+        Document.user_id == document.user_id,
+        Document.hash_fingerprint == document.hash_fingerprint,
+        Document.status == DocumentStatus.ready,
+        Document.storage_key_filled.endswith(filled_key_suffix, autoescape=True)
+    ).order_by(Document.created_at.desc()).first()
@@ -0,0 +1,96 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from app.services.pdf_fields import extract_fields_from_pdf, inspect_pdf
+
+
+def _add_widget(page, field_type, name, rect):
+    widget = fitz.Widget()
+    widget.field_type = field_type
+    widget.field_name = name
+    widget.rect = fitz.Rect(rect)
+    if field_type == fitz.PDF_WIDGET_TYPE_RADIOBUTTON:
+        widget.field_value = False
+    page.add_widget(widget)
+
+
+def _build_pdf(widget_pages):
+    """Build a Letter-sized PDF; widget_pages holds (type, name, rect) lists per page."""
+    doc = fitz.open()
+    for widgets in widget_pages:
+        page = doc.new_page(width=612, height=792)
+        for field_type, name, rect in widgets:
+            _add_widget(page, field_type, name, rect)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def form_pdf():
+    return _build_pdf([
+        [
+            (fitz.PDF_WIDGET_TYPE_TEXT, "FullName", (61.2, 79.2, 306, 99.2)),
+            (fitz.PDF_WIDGET_TYPE_CHECKBOX, "Agree0", (61.2, 120, 75.2, 134)),
+            (fitz.PDF_WIDGET_TYPE_RADIOBUTTON, "Choice", (61.2, 150, 75.2, 164)),
+        ],
+        [],
+        [
+            (fitz.PDF_WIDGET_TYPE_SIGNATURE, "Applicant", (61.2, 600, 306, 640)),
+        ],
+    ])
+
+
+def test_extract_fields_maps_widget_types(form_pdf):
+    fields = extract_fields_from_pdf(form_pdf)
+
+    types = {field.name: field.type for field in fields}
+    assert types == {
+        "FullName": "text",
+        "Agree0": "checkbox",
+        "Choice": "checkbox",
+        "Applicant": "signature",
+    }
+
+
+def test_extract_fields_normalizes_bbox_and_keeps_page(form_pdf):
+    fields = {field.name: field for field in extract_fields_from_pdf(form_pdf)}
+
+    assert fields["FullName"].page == 0
+    assert fields["FullName"].bbox == pytest.approx([0.1, 0.1, 0.5, 99.2 / 792])
+    assert fields["Applicant"].page == 2
+
+
+def test_extract_fields_name_overrides_widget_type():
+    pdf = _build_pdf([[(fitz.PDF_WIDGET_TYPE_TEXT, "choiceButton_0", (10, 10, 30, 30))]])
+
+    [field] = extract_fields_from_pdf(pdf)
+    assert field.type == "checkbox"
+
+
+def test_extract_fields_accepts_path(tmp_path, form_pdf):
+    path = tmp_path / "form.pdf"
+    path.write_bytes(form_pdf)
+
+    assert len(extract_fields_from_pdf(str(path))) == 4
+
+
+def test_extract_fields_flat_pdf_returns_nothing():
+    assert extract_fields_from_pdf(_build_pdf([[], []])) == []
+
+
+def test_inspect_pdf_reports_page_coverage(tmp_path, form_pdf):
+    partial = tmp_path / "partial.pdf"
+    partial.write_bytes(form_pdf)
+    covered = tmp_path / "covered.pdf"
+    covered.write_bytes(_build_pdf([
+        [(fitz.PDF_WIDGET_TYPE_TEXT, "A", (10, 10, 100, 30))],
+        [(fitz.PDF_WIDGET_TYPE_TEXT, "B", (10, 10, 100, 30))],
+    ]))
+    flat = tmp_path / "flat.pdf"
+    flat.write_bytes(_build_pdf([[]]))
+
+    assert inspect_pdf(str(partial)) == (3, True, False)
+    assert inspect_pdf(str(covered)) == (2, True, True)
+    assert inspect_pdf(str(flat)) == (1, False, False)
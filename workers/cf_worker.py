@@ -4,28 +4,65 @@ Processes PDFs using CommonForms library to detect fields and generate fillable
 """
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import insert
 from typing import List, Dict, Optional
+import anyio
+import anyio.to_thread
 import os
+import re
 import sys
 import tempfile
 import json
+import threading
+from functools import partial
 from uuid import UUID, uuid4
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from app.config import settings
 from app.database import SessionLocal
 from app.models.document import Document, DocumentStatus
-from app.models.field import FieldRegion, FieldType
+from app.models.field import FieldRegion
 from app.services.storage import get_storage_service
+from app.services.pdf_fields import extract_fields_from_pdf, inspect_pdf, map_commonforms_type
+from app.utils.idempotency import find_processed_duplicate
 from app.utils.logging import get_logger
 
 app = FastAPI(title="DocumentAI CommonForms Worker")
 logger = get_logger(__name__)
 
+# Patch state and loaded detectors are per process (torch state is not fork-safe)
+_patch_lock = threading.Lock()
+_patch_applied = False
+_detector_lock = threading.Lock()
+_detector_cache: Dict[tuple, object] = {}
+
+# All requests in a process share one cached model, so run one inference at a
+# time per process and scale out with WORKERS instead
+_inference_limiter: Optional[anyio.CapacityLimiter] = None
+
+
+def get_inference_limiter() -> anyio.CapacityLimiter:
+    # Created on first use so it binds to the running event loop
+    global _inference_limiter
+    if _inference_limiter is None:
+        _inference_limiter = anyio.CapacityLimiter(1)
+    return _inference_limiter
+
+
 # Monkey patch commonforms AFTER import to fix tuple issue
 # The issue is that rfdetr returns tuple but commonforms expects Detections object
 def apply_commonforms_patch():
+    global _patch_applied
+    with _patch_lock:
+        if _patch_applied:
+            return True
+        _patch_applied = _apply_commonforms_patch()
+        return _patch_applied
+
+
+def _apply_commonforms_patch():
     try:
         from supervision import Detections
         import numpy as np
@@ -37,7 +74,8 @@ def apply_commonforms_patch():
         # Store original extract_widgets method
         original_extract_widgets = FFDetrDetector.extract_widgets
         
-        def patched_extract_widgets(self, pages, confidence=0.4, image_size=1120, batch_size=3):
+        # prepare_form() never forwards batch_size, so the configured value is the default
+        def patched_extract_widgets(self, pages, confidence=0.4, image_size=1120, batch_size=settings.commonforms_batch_size):
             """Patched version that handles tuple results from model.predict()"""
             from commonforms.inference import batch, Widget, BoundingBox, sort_widgets
             import logging
@@ -53,17 +91,21 @@ def apply_commonforms_patch():
                 if isinstance(predictions, tuple):
                     logger.info(f"[PATCH] Converting tuple to Detections (len={len(predictions)})")
                     if len(predictions) >= 3:
+                        # np.asarray wraps existing arrays/tensors without copying
                         predictions = Detections(
-                            xyxy=np.array(predictions[0]) if not isinstance(predictions[0], np.ndarray) else predictions[0],
-                            class_id=np.array(predictions[1]) if not isinstance(predictions[1], np.ndarray) else predictions[1],
-                            confidence=np.array(predictions[2]) if not isinstance(predictions[2], np.ndarray) else predictions[2]
+                            xyxy=np.asarray(predictions[0]),
+                            class_id=np.asarray(predictions[1]),
+                            confidence=np.asarray(predictions[2])
                         )
                         logger.info(f"[PATCH] Converted to Detections with {len(predictions)} detections")
                     else:
                         logger.error(f"[PATCH] Unexpected tuple format: {len(predictions)} elements")
-                        predictions = Detections(xyxy=np.array([]), class_id=np.array([]), confidence=np.array([]))
+                        # Properly shaped (0, 4) placeholder so with_nms/xyxy math still works
+                        predictions = Detections.empty()
                 
-                if len(pages) == 1 or batch_size == 1:
+                # predict() returns a bare Detections for a single image, including
+                # a short final batch, and a list otherwise
+                if len(b) == 1:
                     predictions = [predictions]
                 results.extend(predictions)
 
@@ -75,10 +117,12 @@ def apply_commonforms_patch():
                 logging.info(f"\t\t{len(detections)} after nms")
                 widgets[page_ix] = []
 
-                for class_id, box in zip(detections.class_id, detections.xyxy):
-                    x0, x1 = box[[0, 2]] / pages[page_ix].image.width
-                    y0, y1 = box[[1, 3]] / pages[page_ix].image.height
+                # Normalize all boxes for the page in one vectorized pass
+                image = pages[page_ix].image
+                scale = np.array([image.width, image.height, image.width, image.height], dtype=np.float64)
+                boxes = (detections.xyxy / scale).tolist()
 
+                for class_id, (x0, y0, x1, y1) in zip(detections.class_id, boxes):
                     widget_type = self.id_to_cls[class_id]
 
                     widgets[page_ix].append(
@@ -96,14 +140,96 @@ def apply_commonforms_patch():
         # Apply the patch
         FFDetrDetector.extract_widgets = patched_extract_widgets
         logger.info("[PATCH] Successfully patched commonforms.inference.FFDetrDetector.extract_widgets")
+        
+        # prepare_form() builds a new detector (and reloads the model) on every call,
+        # so hand it a cached instance per set of constructor arguments instead
+        def cached_detector(detector_cls):
+            def factory(*args, **kwargs):
+                key = (detector_cls.__name__, args, tuple(sorted(kwargs.items())))
+                with _detector_lock:
+                    detector = _detector_cache.get(key)
+                    if detector is None:
+                        logger.info(f"[PATCH] Loading {detector_cls.__name__} {args}")
+                        detector = detector_cls(*args, **kwargs)
+                        _detector_cache[key] = detector
+                return detector
+            return factory
+        
+        commonforms.inference.FFDetrDetector = cached_detector(FFDetrDetector)
+        FFDNetDetector = getattr(commonforms.inference, "FFDNetDetector", None)
+        if FFDNetDetector is not None:
+            commonforms.inference.FFDNetDetector = cached_detector(FFDNetDetector)
+        logger.info("[PATCH] Detector instances are now cached per process")
         return True
     except Exception as e:
-        logger.error(f"[PATCH] Failed to patch commonforms: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"[PATCH] Failed to patch commonforms: {e}", exc_info=True)
         return False
 
 
+def resolve_device() -> str:
+    """Resolve the configured inference device; "auto" prefers CUDA, then MPS, then CPU."""
+    if settings.commonforms_device != "auto":
+        return settings.commonforms_device
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        mps = getattr(torch.backends, "mps", None)
+        if mps is not None and mps.is_available():
+            return "mps"
+    except ImportError:
+        pass
+    return "cpu"
+
+
+INFERENCE_DEVICE = resolve_device()
+
+
+def loaded_device() -> Optional[str]:
+    """
+    Device of the cached detector, when one is loaded and exposes it.
+    
+    FFDetr ignores the device argument, so the configured device is not reported.
+    """
+    with _detector_lock:
+        detectors = list(_detector_cache.values())
+    for detector in detectors:
+        for holder in (detector, getattr(detector, "model", None)):
+            device = getattr(holder, "device", None)
+            if device is not None:
+                return str(device)
+    return None
+
+
+def detection_tag() -> str:
+    """Path-safe tag for the settings that shape the fillable PDF CommonForms produces."""
+    tag = settings.commonforms_model
+    if settings.commonforms_fast:
+        tag += "-fast"
+    if settings.commonforms_skip_acroform:
+        tag += "-skip-acroform"
+    return re.sub(r"[^A-Za-z0-9.-]+", "-", tag)
+
+
+def fillable_key(user_id, document_id) -> str:
+    """Storage key of a document's own fillable PDF, scoped by detection settings."""
+    return f"commonforms/{user_id}/{document_id}/{detection_tag()}/fillable.pdf"
+
+
+@app.on_event("startup")
+async def startup_event():
+    # Patch once per process so requests don't pay for it
+    logger.info(f"[CF-WORKER] Patch applied at startup: {apply_commonforms_patch()}")
+    logger.info(f"[CF-WORKER] Configured inference device: {INFERENCE_DEVICE} (honoured by FFDNet models only)")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Release pooled Supabase Storage connections
+    from app.services.supabase_storage import SupabaseStorageService
+    await SupabaseStorageService.close_clients()
+
+
 class CommonFormsRequest(BaseModel):
     document_id: str
     job_id: str
@@ -156,16 +282,71 @@ async def process_commonforms(request: CommonFormsRequest):
         db.commit()
         logger.info(f"[CF-WORKER] Updated document status to processing")
         
-        # Step 2: Download PDF from storage
         storage = get_storage_service()
+        user_id = doc.user_id
+        storage_key_original = doc.storage_key_original
         
+        # Identical re-uploads processed with the same detection settings reuse the
+        # earlier result instead of re-running the model
+        duplicate = find_processed_duplicate(
+            db, doc, filled_key_suffix=f"/{detection_tag()}/fillable.pdf"
+        )
+        if duplicate:
+            duplicate_id = duplicate.id
+            duplicate_key = duplicate.storage_key_filled
+            duplicate_acroform = duplicate.acroform
+            duplicate_page_count = duplicate.page_count
+            logger.info(f"[CF-WORKER] Reusing results from duplicate document {duplicate_id}")
+            
+            # Don't hold a pooled connection across the storage round-trips
+            db.close()
+            
+            # Copy the fillable PDF to this document's own key so reprocessing the
+            # source document can never rewrite this one
+            output_key = fillable_key(user_id, document_id)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                copy_path = os.path.join(tmp_dir, "fillable.pdf")
+                await storage.download_to_path(key=duplicate_key, local_path=copy_path)
+                await storage.upload_file(
+                    local_path=copy_path,
+                    key=output_key,
+                    content_type="application/pdf"
+                )
+            
+            doc = db.query(Document).filter(Document.id == UUID(document_id)).first()
+            if not doc:
+                raise Exception("Document was deleted during processing")
+            fields_response = copy_field_regions(db, source_id=duplicate_id, target_id=doc.id)
+            
+            doc.status = DocumentStatus.ready
+            doc.storage_key_filled = output_key
+            doc.acroform = duplicate_acroform
+            doc.page_count = duplicate_page_count
+            db.commit()
+            
+            presigned_url = storage.generate_presigned_url(key=output_key, expires_in=3600)
+            logger.info(f"[CF-WORKER] ✅ Reused {len(fields_response)} fields from duplicate document")
+            
+            return CommonFormsResponse(
+                job_id=job_id,
+                document_id=document_id,
+                status="completed",
+                output_pdf_url=presigned_url,
+                fields=fields_response
+            )
+        
+        # Release the connection back to the pool before the download and the
+        # inference queue; the document is re-fetched once the PDF is ready
+        db.close()
+        
+        # Step 2: Download PDF from storage
         with tempfile.TemporaryDirectory() as tmp_dir:
             input_path = os.path.join(tmp_dir, "input.pdf")
             output_path = os.path.join(tmp_dir, "output.pdf")
             
-            logger.info(f"[CF-WORKER] Step 2: Downloading PDF from {doc.storage_key_original}")
+            logger.info(f"[CF-WORKER] Step 2: Downloading PDF from {storage_key_original}")
             await storage.download_to_path(
-                key=doc.storage_key_original,
+                key=storage_key_original,
                 local_path=input_path
             )
             logger.info(f"[CF-WORKER] Downloaded PDF to {input_path}")
@@ -174,224 +355,224 @@ async def process_commonforms(request: CommonFormsRequest):
             file_size = os.path.getsize(input_path)
             logger.info(f"[CF-WORKER] Input PDF size: {file_size} bytes")
             
-            # Step 3: Run CommonForms prepare_form()
-            logger.info(f"[CF-WORKER] Step 3: Running CommonForms prepare_form()")
-            try:
-                from commonforms import prepare_form
-                
-                # Apply patch to fix tuple issue
-                patch_result = apply_commonforms_patch()
-                logger.info(f"[CF-WORKER] Patch application result: {patch_result}")
-                if not patch_result:
-                    raise Exception("Failed to apply commonforms patch")
-                
-                # Use "FFDetr" - CommonForms will use HuggingFace cache if available
-                # The model is pre-downloaded during Docker build, so it uses the cache
-                logger.info(f"[CF-WORKER] Using model: FFDetr (with tuple fix patch applied)")
-                
-                prepare_form(
-                    input_path,
-                    output_path,
-                    model_or_path="FFDetr",
-                    confidence=0.4,
-                    device="cpu",
-                    batch_size=1
-                )
-                logger.info(f"[CF-WORKER] CommonForms prepare_form() completed successfully")
-                
-                # Verify output exists
-                if not os.path.exists(output_path):
-                    raise Exception("CommonForms did not generate output PDF")
-                
-                output_size = os.path.getsize(output_path)
-                logger.info(f"[CF-WORKER] Output PDF size: {output_size} bytes")
-                
-            except ImportError as e:
-                logger.error(f"[CF-WORKER] CommonForms not installed: {e}")
-                doc.status = DocumentStatus.failed
-                doc.error_message = "CommonForms library not installed"
-                db.commit()
-                raise HTTPException(
-                    status_code=500,
-                    detail="CommonForms library not installed"
-                )
-            except Exception as e:
-                logger.error(f"[CF-WORKER] CommonForms processing failed: {e}")
-                doc.status = DocumentStatus.failed
-                doc.error_message = f"CommonForms error: {str(e)}"
-                db.commit()
-                raise HTTPException(status_code=500, detail=f"CommonForms error: {str(e)}")
+            # One open of the input gives the page count and AcroForm coverage
+            page_count, input_has_fields, all_pages_covered = inspect_pdf(input_path)
+            logger.info(f"[CF-WORKER] Input PDF pages: {page_count}, AcroForm fields: {input_has_fields}, all pages covered: {all_pages_covered}")
+            
+            # Fast path: only skip the model when every page already has form fields;
+            # a partly fillable PDF still needs detection on its flat pages
+            skip_detection = settings.commonforms_skip_acroform and all_pages_covered
+            
+            if skip_detection:
+                logger.info(f"[CF-WORKER] Step 3: Every page already has AcroForm fields, skipping CommonForms")
+                output_path = input_path
+            else:
+                # Step 3: Run CommonForms prepare_form()
+                logger.info(f"[CF-WORKER] Step 3: Running CommonForms prepare_form()")
+                try:
+                    from commonforms import prepare_form
+                    
+                    # No-op once the startup hook has patched; retries if it failed there
+                    if not apply_commonforms_patch():
+                        raise Exception("Failed to apply commonforms patch")
+                    
+                    # Default "FFDetr" - CommonForms will use HuggingFace cache if available
+                    # The model is pre-downloaded during Docker build, so it uses the cache
+                    logger.info(f"[CF-WORKER] Using model: {settings.commonforms_model} (fast={settings.commonforms_fast})")
+                    
+                    # Inference is CPU-bound; keep the event loop free for health checks
+                    # while queued requests wait for the per-process limiter
+                    await anyio.to_thread.run_sync(
+                        partial(
+                            prepare_form,
+                            input_path,
+                            output_path,
+                            model_or_path=settings.commonforms_model,
+                            confidence=0.4,
+                            device=INFERENCE_DEVICE,
+                            fast=settings.commonforms_fast,
+                            batch_size=settings.commonforms_batch_size
+                        ),
+                        limiter=get_inference_limiter()
+                    )
+                    logger.info(f"[CF-WORKER] CommonForms prepare_form() completed successfully")
+                    
+                    # Verify output exists
+                    if not os.path.exists(output_path):
+                        raise Exception("CommonForms did not generate output PDF")
+                    
+                    output_size = os.path.getsize(output_path)
+                    logger.info(f"[CF-WORKER] Output PDF size: {output_size} bytes")
+                    
+                except ImportError as e:
+                    logger.error(f"[CF-WORKER] CommonForms not installed: {e}")
+                    mark_document_failed(db, document_id, "CommonForms library not installed")
+                    raise HTTPException(
+                        status_code=500,
+                        detail="CommonForms library not installed"
+                    )
+                except Exception as e:
+                    logger.error(f"[CF-WORKER] CommonForms processing failed: {e}")
+                    mark_document_failed(db, document_id, f"CommonForms error: {str(e)}")
+                    raise HTTPException(status_code=500, detail=f"CommonForms error: {str(e)}")
             
             # Step 4: Extract field metadata from generated PDF
             logger.info(f"[CF-WORKER] Step 4: Extracting fields from output PDF")
-            field_metadata = extract_fields_from_pdf(output_path)
+            # Read the output once; the same bytes feed extraction and the upload
+            with open(output_path, "rb") as f:
+                output_bytes = f.read()
+            field_metadata = extract_fields_from_pdf(output_bytes)
             logger.info(f"[CF-WORKER] Extracted {len(field_metadata)} fields")
             
             # Step 5: Upload output PDF to Supabase Storage
-            logger.info(f"[CF-WORKER] Step 5: Uploading fillable PDF to Supabase")
-            output_key = f"commonforms/{doc.user_id}/{document_id}/fillable.pdf"
-            output_url = await storage.upload_file(
-                local_path=output_path,
-                key=output_key,
-                content_type="application/pdf"
-            )
-            logger.info(f"[CF-WORKER] Uploaded fillable PDF to {output_key}")
-            
-            # Step 6: Save field regions to DB
-            logger.info(f"[CF-WORKER] Step 6: Saving field regions to database")
-            fields_response = []
-            
-            for idx, field_data in enumerate(field_metadata):
-                field_region = FieldRegion(
-                    document_id=doc.id,
-                    page_index=field_data['page'],
-                    x=field_data['bbox'][0],
-                    y=field_data['bbox'][1],
-                    width=field_data['bbox'][2] - field_data['bbox'][0],
-                    height=field_data['bbox'][3] - field_data['bbox'][1],
-                    field_type=map_commonforms_type(field_data['type']),
-                    label=field_data.get('label', f'Field_{idx}'),
-                    confidence=1.0,
-                    template_key=field_data.get('name')
+            if skip_detection:
+                # The original is already fillable, so serve it as-is
+                output_key = storage_key_original
+                logger.info(f"[CF-WORKER] Step 5: Reusing original PDF as fillable PDF")
+            else:
+                logger.info(f"[CF-WORKER] Step 5: Uploading fillable PDF to Supabase")
+                output_key = fillable_key(user_id, document_id)
+                output_url = await storage.upload_bytes(
+                    data=output_bytes,
+                    key=output_key,
+                    content_type="application/pdf"
                 )
-                db.add(field_region)
-                db.flush()  # Get the ID
-                
-                fields_response.append(FieldData(
-                    id=str(field_region.id),
-                    type=field_data['type'],
-                    page=field_data['page'],
-                    bbox=field_data['bbox'],
-                    label=field_data.get('label')
-                ))
-                logger.info(f"[CF-WORKER] Saved field: {field_data.get('label', f'Field_{idx}')} ({field_data['type']})")
-            
-            # Step 7: Update document status
-            logger.info(f"[CF-WORKER] Step 7: Updating document status to ready")
-            doc.status = DocumentStatus.ready
-            doc.storage_key_filled = output_key
-            db.commit()
-            
-            # Generate presigned URL for response
-            presigned_url = storage.generate_presigned_url(key=output_key, expires_in=3600)
-            
-            logger.info(f"[CF-WORKER] ✅ CommonForms processing completed successfully")
-            logger.info(f"[CF-WORKER] Output URL: {presigned_url}")
-            logger.info(f"[CF-WORKER] Fields detected: {len(fields_response)}")
+                logger.info(f"[CF-WORKER] Uploaded fillable PDF to {output_key}")
+        
+        # Step 6: Save field regions to DB
+        logger.info(f"[CF-WORKER] Step 6: Saving field regions to database")
+        doc = db.query(Document).filter(Document.id == UUID(document_id)).first()
+        if not doc:
+            raise Exception("Document was deleted during processing")
+        
+        field_rows = []
+        fields_response = []
+        
+        for field_data in field_metadata:
+            # Assign IDs up front so the rows can be inserted in one batch
+            field_id = uuid4()
+            x0, y0, x1, y1 = field_data.bbox
+            field_rows.append({
+                'id': field_id,
+                'document_id': doc.id,
+                'page_index': field_data.page,
+                'x': x0,
+                'y': y0,
+                'width': x1 - x0,
+                'height': y1 - y0,
+                'field_type': map_commonforms_type(field_data.type),
+                'label': field_data.name,
+                'confidence': 1.0,
+                'template_key': field_data.name
+            })
             
-            return CommonFormsResponse(
-                job_id=job_id,
-                document_id=document_id,
-                status="completed",
-                output_pdf_url=presigned_url,
-                fields=fields_response
-            )
+            fields_response.append(FieldData(
+                id=str(field_id),
+                type=field_data.type,
+                page=field_data.page,
+                bbox=field_data.bbox,
+                label=field_data.name
+            ))
+            logger.info(f"[CF-WORKER] Saved field: {field_data.name} ({field_data.type})")
+        
+        if field_rows:
+            db.execute(insert(FieldRegion), field_rows)
+        
+        # Step 7: Update document status
+        logger.info(f"[CF-WORKER] Step 7: Updating document status to ready")
+        doc.status = DocumentStatus.ready
+        doc.storage_key_filled = output_key
+        doc.acroform = input_has_fields
+        doc.page_count = page_count
+        db.commit()
+        
+        # Generate presigned URL for response
+        presigned_url = storage.generate_presigned_url(key=output_key, expires_in=3600)
+        
+        logger.info(f"[CF-WORKER] ✅ CommonForms processing completed successfully")
+        logger.info(f"[CF-WORKER] Output URL: {presigned_url}")
+        logger.info(f"[CF-WORKER] Fields detected: {len(fields_response)}")
+        
+        return CommonFormsResponse(
+            job_id=job_id,
+            document_id=document_id,
+            status="completed",
+            output_pdf_url=presigned_url,
+            fields=fields_response
+        )
     
     except HTTPException:
         raise
     except Exception as e:
         error_msg = f"{type(e).__name__}: {str(e)}"
-        logger.error(f"[CF-WORKER] ❌ Processing failed: {error_msg}")
-        
-        import traceback
-        logger.error(f"[CF-WORKER] Traceback:\n{traceback.format_exc()}")
-        
-        try:
-            doc = db.query(Document).filter(Document.id == UUID(document_id)).first()
-            if doc:
-                doc.status = DocumentStatus.failed
-                doc.error_message = error_msg
-                db.commit()
-        except Exception as db_error:
-            logger.error(f"[CF-WORKER] Failed to update document status: {db_error}")
+        logger.error(f"[CF-WORKER] ❌ Processing failed: {error_msg}", exc_info=True)
         
+        mark_document_failed(db, document_id, error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
     
     finally:
         db.close()
 
 
-def extract_fields_from_pdf(pdf_path: str) -> List[Dict]:
+def mark_document_failed(db, document_id: str, error_message: str):
     """
-    Extract AcroForm fields from the CommonForms-generated PDF.
+    Re-fetch the document and mark it failed; the session may have been closed mid-job.
     """
-    import fitz  # PyMuPDF
-    
-    fields = []
-    pdf_doc = fitz.open(pdf_path)
-    
     try:
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc[page_num]
-            page_rect = page.rect
-            
-            for widget in page.widgets():
-                if widget is None:
-                    continue
-                
-                field_name = widget.field_name or f"field_{page_num}_{len(fields)}"
-                field_type_code = widget.field_type
-                rect = widget.rect
-                
-                # Map PDF widget type
-                if field_type_code == fitz.PDF_WIDGET_TYPE_TEXT:
-                    field_type = "text"
-                elif field_type_code == fitz.PDF_WIDGET_TYPE_BUTTON:
-                    field_type = "checkbox"
-                elif field_type_code == fitz.PDF_WIDGET_TYPE_SIGNATURE:
-                    field_type = "signature"
-                else:
-                    field_type = "text"
-                
-                # Infer from CommonForms naming convention
-                name_lower = field_name.lower()
-                if "checkbox" in name_lower or "choicebutton" in name_lower:
-                    field_type = "checkbox"
-                elif "signature" in name_lower:
-                    field_type = "signature"
-                elif "textbox" in name_lower:
-                    field_type = "text"
-                
-                # Normalize bbox to [0,1] coordinates
-                bbox = [
-                    rect.x0 / page_rect.width,
-                    rect.y0 / page_rect.height,
-                    rect.x1 / page_rect.width,
-                    rect.y1 / page_rect.height
-                ]
-                
-                fields.append({
-                    'page': page_num,
-                    'type': field_type,
-                    'bbox': bbox,
-                    'label': field_name,
-                    'name': field_name
-                })
-    finally:
-        pdf_doc.close()
-    
-    return fields
+        db.rollback()
+        doc = db.query(Document).filter(Document.id == UUID(document_id)).first()
+        if doc:
+            doc.status = DocumentStatus.failed
+            doc.error_message = error_message
+            db.commit()
+    except Exception as db_error:
+        logger.error(f"[CF-WORKER] Failed to update document status: {db_error}")
 
 
-def map_commonforms_type(cf_type: str) -> FieldType:
-    """Map CommonForms field type to FieldType enum."""
-    type_map = {
-        'text': FieldType.text,
-        'textarea': FieldType.multiline,
-        'checkbox': FieldType.checkbox,
-        'date': FieldType.date,
-        'number': FieldType.number,
-        'signature': FieldType.signature,
-        'radio': FieldType.checkbox,
-        'select': FieldType.text,
-    }
-    return type_map.get(cf_type.lower(), FieldType.text)
+def copy_field_regions(db, source_id: UUID, target_id: UUID) -> List[FieldData]:
+    """
+    Copy the field regions of an already processed document onto another one.
+    """
+    regions = db.query(FieldRegion).filter(FieldRegion.document_id == source_id).all()
+    
+    field_rows = []
+    fields_response = []
+    for region in regions:
+        field_id = uuid4()
+        field_rows.append({
+            'id': field_id,
+            'document_id': target_id,
+            'page_index': region.page_index,
+            'x': region.x,
+            'y': region.y,
+            'width': region.width,
+            'height': region.height,
+            'field_type': region.field_type,
+            'label': region.label,
+            'confidence': region.confidence,
+            'template_key': region.template_key
+        })
+        fields_response.append(FieldData(
+            id=str(field_id),
+            type=region.field_type.value,
+            page=region.page_index,
+            bbox=[region.x, region.y, region.x + region.width, region.y + region.height],
+            label=region.label
+        ))
+    
+    if field_rows:
+        db.execute(insert(FieldRegion), field_rows)
+    return fields_response
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    return {"status": "ok", "service": "commonforms-worker"}
+    health = {"status": "ok", "service": "commonforms-worker"}
+    device = loaded_device()
+    if device is not None:
+        health["device"] = device
+    return health
 
 
 @app.get("/test-patch")